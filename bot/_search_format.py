@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Shared formatting helpers for JumpCloud MCP search_api results.
+
+Used by app.py / appv1.py (Slack mrkdwn output) and jc-cli.py (plain
+text); previously each file carried its own copy of this code.
+
+This module is deliberately self-contained and fully type-annotated so it
+can be compiled as-is for the formatting hot loop:
+
+    pip install mypyc && mypyc _search_format.py
+    # or: cythonize -i _search_format.py
+
+Both produce a C extension under the same module name, so the plain
+`from _search_format import ...` in the entrypoints transparently picks
+up the compiled version when present and falls back to pure Python
+otherwise.
+"""
+import json
+import functools
+from typing import Any, Dict, List, Optional, Tuple
+
+# orjson parses/serializes several times faster than stdlib json; keep the
+# stdlib as a fallback so the callers still run without it.
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+    _json_loads = json.loads
+
+
+def _fmt_kv_md(kv: Tuple[str, Any]) -> str:
+    k, v = kv
+    return f"*{k}*: `{v}`"
+
+
+def _fmt_kv_plain(kv: Tuple[str, Any]) -> str:
+    k, v = kv
+    return f"{k}={v}"
+
+
+# Keys that mark a row as user-shaped; one set-intersection check gates the
+# per-field lookups so device/policy rows skip straight to the generic branch.
+_USER_KEYS = frozenset({"user.username", "user.email", "user.id"})
+
+
+def _extract_inner_json_from_search_api_result(result: Any) -> Optional[Dict[str, Any]]:
+    """
+    search_api results currently look like:
+
+    {
+      "meta": null,
+      "content": [
+        {
+          "type": "text",
+          "text": "<JSON STRING HERE>",
+          ...
+        }
+      ],
+      "isError": false
+    }
+
+    This tries to grab that inner JSON string and parse it.
+    """
+    # 1) Try structuredContent first (future-proof)
+    structured = getattr(result, "structuredContent", None)
+    if isinstance(structured, dict):
+        return structured
+
+    # 2) Fall back to content[].text. In practice content[0].text is the
+    # payload, so take that directly and only scan the remainder if the
+    # first item doesn't parse.
+    content = getattr(result, "content", None)
+    if not content:
+        return None
+
+    loads = _json_loads
+    first = content[0]
+    text_val = first.text if hasattr(first, "text") else None
+    if isinstance(text_val, str):
+        try:
+            inner = loads(text_val)
+        except Exception:
+            inner = None
+        if isinstance(inner, dict):
+            return inner
+
+    for item in content[1:]:
+        text_val = getattr(item, "text", None)
+        if isinstance(text_val, str):
+            # The text itself is a JSON string
+            try:
+                inner = loads(text_val)
+                if isinstance(inner, dict):
+                    return inner
+            except Exception:
+                # not JSON, ignore and continue
+                continue
+
+    return None
+
+
+def _format_search_api_results(inner: Dict[str, Any], markdown: bool = True) -> str:
+    """
+    Takes the parsed inner JSON from search_api and renders it for humans —
+    Slack mrkdwn when markdown=True, plain text for the CLI otherwise.
+
+    Expected shape (from a live sample):
+
+    {
+      "explanation": "...",
+      "query_result": {
+        "metadata": { "queryTime": ..., "schema": [...] },
+        "results": [
+          {
+            "fields": [
+              {"field": "user.first_name", "value": "Akash"},
+              ...
+            ],
+            "itemnum": 1
+          }
+        ]
+      },
+      "rationale": "...",
+      "search_query": {...},
+      "type": "dsl"
+    }
+    """
+    explanation = inner.get("explanation")
+    rationale = inner.get("rationale")
+    query_result = inner.get("query_result", {}) or {}
+    metadata = query_result.get("metadata", {}) or {}
+    results: List[Dict[str, Any]] = query_result.get("results", []) or []
+
+    MAX_ROWS = 20
+
+    # Only the first MAX_ROWS rows are ever rendered; drop the rest before
+    # any per-row work so huge responses don't cost more than small ones.
+    total = len(results)
+    if total > MAX_ROWS:
+        results = results[:MAX_ROWS]
+
+    # Preallocate the line buffer at its maximum size and fill by index:
+    # one allocation up front, one join at the end, no append churn.
+    est = 9 + len(results)
+    lines: List[str] = [""] * est
+    i = 0
+
+    def put(s: str) -> None:
+        nonlocal i
+        lines[i] = s
+        i += 1
+
+    qt = metadata.get("queryTime")
+    if markdown:
+        if explanation:
+            put(f"*Explanation:*\n{explanation}\n")
+        if rationale:
+            put(f"*Why this query:* {rationale}\n")
+        if qt is not None:
+            put(f"_Query time_: `{qt}`\n")
+    else:
+        if explanation:
+            put("Explanation:")
+            put(explanation)
+            put("")
+        if rationale:
+            put(f"Why this query: {rationale}")
+            put("")
+        if qt is not None:
+            put(f"Query time: {qt}")
+            put("")
+
+    if not results:
+        put("_No results found._" if markdown else "No results found.")
+        return "\n".join(lines[:i])
+
+    shown = min(total, MAX_ROWS)
+    if markdown:
+        put(f"*Results* (showing up to {shown}):")
+    else:
+        put(f"Results (showing up to {shown}):")
+
+    bullet = "• " if markdown else " - "
+    sep = " – " if markdown else " | "
+    fmt_kv = _fmt_kv_md if markdown else _fmt_kv_plain
+
+    for row in results:
+        fields_list = row.get("fields", []) or []
+        # Turn [{"field": "...", "value": "..."}] into dict
+        field_map: Dict[str, Any] = {
+            f["field"]: f.get("value") for f in fields_list if "field" in f
+        }
+
+        # Special-case user-shaped rows for nicer display
+        if field_map.keys() & _USER_KEYS:
+            fname = field_map.get("user.first_name", "")
+            lname = field_map.get("user.last_name", "")
+            email = field_map.get("user.email")
+            username = field_map.get("user.username")
+            uid = field_map.get("user.id")
+
+            pretty_name = (fname + " " + lname).strip()
+            parts: List[str] = []
+            if username:
+                parts.append(f"`{username}`" if markdown else f"{username}")
+            if pretty_name:
+                parts.append(pretty_name)
+            if email:
+                parts.append(f"<{email}>")
+            if uid:
+                parts.append(f"_id: `{uid}`_" if markdown else f"id={uid}")
+
+            put(bullet + sep.join(parts))
+        else:
+            # Generic: show all fields for this row
+            put(bullet + "; ".join(map(fmt_kv, field_map.items())))
+
+    # If there are more results than MAX_ROWS, hint about truncation
+    if total > MAX_ROWS:
+        extra = total - MAX_ROWS
+        if markdown:
+            put(f"\n_… plus {extra} more results_")
+        else:
+            put(f"... plus {extra} more")
+
+    return "\n".join(lines[:i])
+
+
+@functools.lru_cache(maxsize=256)
+def _render_cached(key: str, markdown: bool) -> str:
+    return _format_search_api_results(_json_loads(key), markdown)
+
+
+def _render(inner: Dict[str, Any], markdown: bool) -> str:
+    """
+    Render via a small LRU keyed by the canonical JSON of the payload so
+    repeated identical MCP responses skip re-rendering entirely.
+    """
+    try:
+        key = json.dumps(inner, sort_keys=True)
+    except (TypeError, ValueError):
+        return _format_search_api_results(inner, markdown)
+    return _render_cached(key, markdown)
+
+
+def _truncate_results(payload: Dict[str, Any], max_rows: int) -> Dict[str, Any]:
+    """
+    Return a shallow copy of a search_api payload with its results list
+    capped at max_rows; handles both top-level and query_result nesting.
+    """
+    rows = payload.get("results")
+    if isinstance(rows, list) and len(rows) > max_rows:
+        return {**payload, "results": rows[:max_rows]}
+    qr = payload.get("query_result")
+    if isinstance(qr, dict):
+        rows = qr.get("results")
+        if isinstance(rows, list) and len(rows) > max_rows:
+            return {**payload, "query_result": {**qr, "results": rows[:max_rows]}}
+    return payload
+
+
+def dump_result_json(result: Any, max_rows: Optional[int] = None) -> str:
+    """
+    Best-effort pretty JSON dump of an MCP CallToolResult: prefer
+    structuredContent, fall back to the full model, then to str().
+
+    max_rows, when given, caps any results list in the structured payload
+    before serializing — the callers slice the rendered string anyway, so
+    there is no point pretty-printing rows that get thrown away.
+    """
+    structured = getattr(result, "structuredContent", None)
+    if structured is not None:
+        if max_rows is not None and isinstance(structured, dict):
+            structured = _truncate_results(structured, max_rows)
+        return _json_dumps(structured)
+    try:
+        return result.model_dump_json(indent=2)
+    except Exception:
+        return str(result)
+
+
+def format_search_api_slack_message(
+    user_query: str, inner: Optional[Dict[str, Any]], result_obj: Any
+) -> str:
+    """
+    Build the final Slack markdown for a given user query + MCP result.
+
+    `inner` is the already-parsed payload from
+    _extract_inner_json_from_search_api_result — the caller extracts once
+    and passes it down, so the inner JSON is never parsed twice for one
+    request. Falls back to a raw JSON dump of result_obj when inner is None.
+    """
+    if inner is None:
+        # Hard fallback: dump the whole MCP CallToolResult JSON
+        raw = dump_result_json(result_obj)
+        return (
+            f"*Query:* `{user_query}`\n"
+            f"Could not parse structured search_api result, showing raw data:\n"
+            f"```json\n{raw[:2700]}\n```"
+        )
+
+    formatted = _render(inner, markdown=True)
+    return f"*Query:* `{user_query}`\n\n{formatted}"
+
+
+def format_for_cli(
+    user_query: str, inner: Optional[Dict[str, Any]], result_obj: Any
+) -> str:
+    if inner is None:
+        # Hard fallback: dump full JSON
+        raw = dump_result_json(result_obj)
+        return f"Query: {user_query}\n\nRaw search_api result:\n{raw}"
+
+    body = _render(inner, markdown=False)
+    return f"Query: {user_query}\n\n{body}"
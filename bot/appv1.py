@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 import os
 import asyncio
-import json
-from typing import Any, Dict, List
+import atexit
+import time
+import threading
+import concurrent.futures
+from contextlib import AsyncExitStack
+from typing import Any, Coroutine, Dict, Optional
 
 from dotenv import load_dotenv
 
@@ -10,8 +14,19 @@ from slack_bolt import App
 from slack_bolt.adapter.flask import SlackRequestHandler
 from flask import Flask, request
 
-from mcp import ClientSession
-from mcp.client.streamable_http import streamablehttp_client
+from _search_format import (
+    _extract_inner_json_from_search_api_result,
+    format_search_api_slack_message,
+)
+
+# Prefer uvloop's libuv-based event loop when available — a drop-in policy
+# swap that measurably speeds up network-heavy asyncio like our MCP calls.
+# Must run before AsyncLoopThread creates its loop.
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
 
 # ----------------- Env & config ----------------- #
 
@@ -29,12 +44,13 @@ if not SLACK_BOT_TOKEN or not SLACK_SIGNING_SECRET:
 if not JC_API_KEY:
     raise RuntimeError("JC_API_KEY (JumpCloud jca_ key) must be set")
 
-# Comma-separated Slack user IDs
-ADMIN_USER_IDS = {
+# Comma-separated Slack user IDs. frozenset: immutable, checked on every
+# /jc, and safe from accidental mutation at runtime.
+ADMIN_USER_IDS = frozenset(
     uid.strip()
     for uid in (os.getenv("ADMIN_USER_IDS") or "").split(",")
     if uid.strip()
-}
+)
 if not ADMIN_USER_IDS:
     print("WARNING: ADMIN_USER_IDS is empty. Nobody will be authorized to use /jc.")
 
@@ -45,202 +61,187 @@ flask_app = Flask(__name__)
 handler = SlackRequestHandler(app)
 
 
-# ----------------- MCP helper (search_api only) ----------------- #
+# ----------------- persistent event loop ----------------- #
 
-async def _mcp_search_api(query: str) -> Any:
+class AsyncLoopThread:
     """
-    Call JumpCloud MCP search_api tool with the given natural-language query.
+    One long-lived asyncio event loop running on a daemon thread.
+
+    Spinning up a fresh loop per /jc (asyncio.run) re-pays loop startup on
+    every request; submitting coroutines to a single background loop
+    amortizes that and lets concurrent Slack commands run in parallel.
     """
-    headers = {
-        "Authorization": f"Bearer {JC_API_KEY}",
-    }
 
-    async with streamablehttp_client(JC_MCP_URL, headers=headers) as (read, write, *_):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            result = await session.call_tool("search_api", arguments={"query": query})
-            return result
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
 
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
 
-def mcp_search_api_sync(query: str) -> Any:
-    """
-    Synchronous wrapper returning the raw CallToolResult object.
-    """
-    return asyncio.run(_mcp_search_api(query))
 
+_LOOP = AsyncLoopThread()
 
-def is_admin(slack_user_id: str) -> bool:
-    return slack_user_id in ADMIN_USER_IDS
 
+# ----------------- MCP helper (search_api only) ----------------- #
 
-# ----------------- Formatting helpers ----------------- #
+# One long-lived MCP session, shared by all /jc requests. Opening a fresh
+# streamablehttp_client per call repays TLS + MCP initialize every time;
+# keeping the context managers open on an AsyncExitStack makes each query
+# a single call_tool round-trip.
+_SESSION: Optional["ClientSession"] = None
+_SESSION_STACK: Optional[AsyncExitStack] = None
+_SESSION_LOCK = asyncio.Lock()
 
-def _extract_inner_json_from_search_api_result(result: Any) -> Dict[str, Any] | None:
-    """
-    Your search_api result currently looks like:
-
-    {
-      "meta": null,
-      "content": [
-        {
-          "type": "text",
-          "text": "<JSON STRING HERE>",
-          ...
-        }
-      ],
-      "isError": false
-    }
-
-    This tries to grab that inner JSON string and parse it.
-    """
-    # 1) Try structuredContent first (future-proof)
-    structured = getattr(result, "structuredContent", None)
-    if isinstance(structured, dict):
-        return structured
-
-    # 2) Fall back to content[].text
-    content = getattr(result, "content", None)
-    if not content:
-        return None
-
-    for item in content:
-        text_val = getattr(item, "text", None)
-        if isinstance(text_val, str):
-            # The text itself is a JSON string
-            try:
-                inner = json.loads(text_val)
-                if isinstance(inner, dict):
-                    return inner
-            except Exception:
-                # not JSON, ignore and continue
-                continue
-
-    return None
-
-
-def _format_search_api_results(inner: Dict[str, Any]) -> str:
+
+async def _connect_session() -> "ClientSession":
+    global _SESSION, _SESSION_STACK
+    # Deferred import: the MCP client stack is only needed once a query
+    # actually runs, so process cold-start doesn't pay for it.
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    headers = {"Authorization": f"Bearer {JC_API_KEY}"}
+
+    stack = AsyncExitStack()
+    read, write, *_ = await stack.enter_async_context(
+        streamablehttp_client(JC_MCP_URL, headers=headers)
+    )
+    session = await stack.enter_async_context(ClientSession(read, write))
+    await session.initialize()
+
+    _SESSION, _SESSION_STACK = session, stack
+    return session
+
+
+async def _close_session() -> None:
+    global _SESSION, _SESSION_STACK
+    if _SESSION_STACK is None:
+        return
+    stack, _SESSION, _SESSION_STACK = _SESSION_STACK, None, None
+    try:
+        await stack.aclose()
+    except Exception:
+        pass
+
+
+def _shutdown_session():
+    try:
+        _LOOP.submit(_close_session()).result(timeout=5)
+    except Exception:
+        pass
+
+
+atexit.register(_shutdown_session)
+
+
+async def _mcp_search_api(query: str) -> Any:
     """
-    Takes the parsed inner JSON from search_api and produces friendly Slack markdown.
-
-    Expected shape (from your sample):
-
-    {
-      "explanation": "...",
-      "query_result": {
-        "metadata": { "queryTime": ..., "schema": [...] },
-        "results": [
-          {
-            "fields": [
-              {"field": "user.first_name", "value": "Akash"},
-              ...
-            ],
-            "itemnum": 1
-          }
-        ]
-      },
-      "rationale": "...",
-      "search_query": {...},
-      "type": "dsl"
-    }
+    Call JumpCloud MCP search_api tool with the given natural-language query,
+    reusing the persistent session (connecting on first use).
     """
-    explanation = inner.get("explanation")
-    rationale = inner.get("rationale")
-    query_result = inner.get("query_result", {}) or {}
-    metadata = query_result.get("metadata", {}) or {}
-    results: List[Dict[str, Any]] = query_result.get("results", []) or []
-
-    lines: List[str] = []
-
-    if explanation:
-        lines.append(f"*Explanation:*\n{explanation}\n")
-
-    if rationale:
-        lines.append(f"*Why this query:* {rationale}\n")
-
-    # Small metadata bits
-    qt = metadata.get("queryTime")
-    if qt is not None:
-        lines.append(f"_Query time_: `{qt}`\n")
-
-    if not results:
-        lines.append("_No results found._")
-        return "\n".join(lines)
-
-    lines.append(f"*Results* (showing up to {min(len(results), 20)}):")
-
-    # Limit to first N to avoid huge Slack messages
-    MAX_ROWS = 20
-    for row in results[:MAX_ROWS]:
-        fields_list = row.get("fields", []) or []
-        # Turn [{"field": "...", "value": "..."}] into dict
-        field_map: Dict[str, Any] = {}
-        for f in fields_list:
-            fname = f.get("field")
-            fval = f.get("value")
-            if fname:
-                field_map[fname] = fval
-
-        # Try to special-case user-type rows for nicer display
-        fname = field_map.get("user.first_name", "")
-        lname = field_map.get("user.last_name", "")
-        email = field_map.get("user.email")
-        username = field_map.get("user.username")
-        uid = field_map.get("user.id")
-
-        if username or email or uid:
-            # Pretty user line
-            pretty_name = (fname + " " + lname).strip()
-            parts = []
-            if username:
-                parts.append(f"`{username}`")
-            if pretty_name:
-                parts.append(pretty_name)
-            if email:
-                parts.append(f"<{email}>")
-            if uid:
-                parts.append(f"_id: `{uid}`_")
-
-            lines.append("• " + " – ".join(parts))
-        else:
-            # Generic: show all fields for this row
-            field_parts = [
-                f"*{k}*: `{v}`"
-                for k, v in field_map.items()
-            ]
-            lines.append("• " + "; ".join(field_parts))
-
-    # If there are more results than MAX_ROWS, hint about truncation
-    if len(results) > MAX_ROWS:
-        lines.append(f"\n_… plus {len(results) - MAX_ROWS} more results_")
-
-    return "\n".join(lines)
-
-
-def format_search_api_slack_message(user_query: str, result_obj: Any) -> str:
+    async with _SESSION_LOCK:
+        session = _SESSION or await _connect_session()
+    try:
+        return await session.call_tool("search_api", arguments={"query": query})
+    except Exception:
+        # Connection is likely broken; drop it so the next call reconnects.
+        async with _SESSION_LOCK:
+            if _SESSION is session:
+                await _close_session()
+        raise
+
+
+# ----------------- TTL result cache ----------------- #
+
+# Admins tend to repeat the same questions ("count users by group"); a short
+# TTL cache on the normalized query text turns those repeats into dict
+# lookups instead of MCP round-trips.
+_CACHE_TTL = 60.0
+_CACHE_MAXSIZE = 512
+_RESULT_CACHE: Dict[str, tuple] = {}  # key -> (expires_at, CallToolResult)
+_RESULT_CACHE_LOCK = threading.Lock()
+
+
+def _cache_get(key: str):
+    with _RESULT_CACHE_LOCK:
+        entry = _RESULT_CACHE.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _RESULT_CACHE[key]
+            return None
+        return value
+
+
+def _cache_put(key: str, value) -> None:
+    with _RESULT_CACHE_LOCK:
+        if len(_RESULT_CACHE) >= _CACHE_MAXSIZE:
+            now = time.monotonic()
+            for k in [k for k, (exp, _) in _RESULT_CACHE.items() if exp < now]:
+                del _RESULT_CACHE[k]
+            while len(_RESULT_CACHE) >= _CACHE_MAXSIZE:
+                _RESULT_CACHE.pop(next(iter(_RESULT_CACHE)))
+        _RESULT_CACHE[key] = (time.monotonic() + _CACHE_TTL, value)
+
+
+def mcp_search_api_sync(query: str, fresh: bool = False) -> Any:
     """
-    Build the final Slack markdown for a given user query + MCP result.
-    Tries to parse inner JSON and present nicely; falls back to JSON dump if needed.
+    Synchronous wrapper returning the raw CallToolResult object.
+    Repeat queries within the TTL are served from cache unless fresh=True.
     """
-    inner = _extract_inner_json_from_search_api_result(result_obj)
+    cache_key = query.strip().lower()
+    if not fresh:
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
 
-    if inner is None:
-        # Hard fallback: dump the whole MCP CallToolResult JSON
-        try:
-            raw = result_obj.model_dump_json(indent=2)
-        except Exception:
-            raw = str(result_obj)
-        return (
-            f"*Query:* `{user_query}`\n"
-            f"Could not parse structured search_api result, showing raw data:\n"
-            f"```json\n{raw[:2700]}\n```"
-        )
+    result = _LOOP.submit(_mcp_search_api(query)).result(timeout=30)
 
-    formatted = _format_search_api_results(inner)
-    return f"*Query:* `{user_query}`\n\n{formatted}"
+    # Don't cache error responses
+    if not getattr(result, "isError", False):
+        _cache_put(cache_key, result)
+    return result
 
 
 # ----------------- Slack command: /jc ----------------- #
 
+# MCP calls can take multiple seconds; running them on Bolt's worker thread
+# ties up its small pool and starves concurrent /jc users. The handler acks
+# and returns immediately, and this executor does the slow work, replying
+# via the command's response_url (which is what `respond` posts to and stays
+# valid long after the HTTP request is acknowledged).
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=16)
+
+# Bound outstanding MCP calls so a burst of /jc commands queues here with a
+# fast, user-visible "busy" reply instead of overloading the JumpCloud MCP
+# endpoint and timing out silently.
+_MCP_SEMA = threading.BoundedSemaphore(8)
+
+
+def _run_and_respond(text: str, fresh: bool, respond) -> None:
+    if not _MCP_SEMA.acquire(timeout=5):
+        respond(":hourglass: JumpCloud MCP is busy right now, please try again.")
+        return
+    try:
+        # Call JumpCloud MCP search_api
+        result_obj = mcp_search_api_sync(text, fresh=fresh)
+
+        # Parse the inner payload exactly once, then hand the dict down
+        inner = _extract_inner_json_from_search_api_result(result_obj)
+        msg = format_search_api_slack_message(text, inner, result_obj)
+
+        # Send the final, formatted response
+        respond(msg)
+
+    except Exception as e:
+        respond(f":warning: Error while calling JumpCloud MCP `search_api`: `{e}`")
+    finally:
+        _MCP_SEMA.release()
+
+
 @app.command("/jc")
 def handle_jc_command(ack, body, respond):
     """
@@ -254,11 +255,18 @@ def handle_jc_command(ack, body, respond):
     ack()
 
     user_id = body.get("user_id")
-    if not user_id or not is_admin(user_id):
+    if not user_id or user_id not in ADMIN_USER_IDS:
         respond(":no_entry: You are not authorized to use this JumpCloud search bot.")
         return
 
     text = (body.get("text") or "").strip()
+
+    # `/jc --fresh <query>` bypasses the TTL cache
+    fresh = False
+    if text.startswith("--fresh"):
+        fresh = True
+        text = text[len("--fresh"):].strip()
+
     if not text:
         respond("Please provide a question, e.g. `/jc count users by group`.")
         return
@@ -266,17 +274,8 @@ def handle_jc_command(ack, body, respond):
     # Send quick "working" message so user sees something immediately
     respond(f"⏳ Working on your JumpCloud query: `{text}` …")
 
-    try:
-        # Call JumpCloud MCP search_api
-        result_obj = mcp_search_api_sync(text)
-
-        msg = format_search_api_slack_message(text, result_obj)
-
-        # Send the final, formatted response
-        respond(msg)
-
-    except Exception as e:
-        respond(f":warning: Error while calling JumpCloud MCP `search_api`: `{e}`")
+    # Hand the slow MCP call to the executor and free the Bolt worker
+    _EXECUTOR.submit(_run_and_respond, text, fresh, respond)
 
 
 # ----------------- Flask route for Slack events ----------------- #
@@ -1,20 +1,44 @@
 #!/usr/bin/env python3
 import os
 import sys
+import json
+import time
+import struct
+import hashlib
+import random
+import functools
 import argparse
 import asyncio
-from typing import Any, Dict
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, asdict
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
 
-from mcp import ClientSession
-from mcp.client.streamable_http import streamablehttp_client
+# The MCP client stack is imported lazily inside the session-open paths:
+# `jc --help` and cache-hit invocations never pay for it.
+
+# orjson serializes nested dicts several times faster than Pydantic's own
+# JSON encoder; optional so the CLI still runs without it.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 JC_MCP_URL = os.getenv("JC_MCP_URL", "https://mcp.jumpcloud.com/v1")
 JC_API_KEY = os.getenv("JC_API_KEY")
 
+# Where `jc daemon` listens; when present, other invocations forward their
+# tool calls here instead of paying TLS + MCP initialize per command.
+DAEMON_SOCKET = os.path.join(os.getenv("XDG_RUNTIME_DIR", "/tmp"), "jc-mcp.sock")
+
 
 # ----------------- shared helpers ----------------- #
 
+# Validated once per process: daemon/batch workloads call with_session
+# thousands of times and the env can't change under us. A failed check
+# exits, so nothing is memoized on the error path.
+@functools.lru_cache(maxsize=1)
 def require_env():
     if not JC_API_KEY:
         print("ERROR: JC_API_KEY env var is not set", file=sys.stderr)
@@ -24,35 +48,1033 @@ def require_env():
         sys.exit(1)
 
 
-def print_result(result: Any) -> None:
+# Built once on first use and reused by every session open; rebuilding the
+# f-string + dict per call is pointless churn for daemon/batch workloads.
+_AUTH_HEADERS: Optional[Dict[str, str]] = None
+
+
+def auth_headers() -> Dict[str, str]:
+    global _AUTH_HEADERS
+    if _AUTH_HEADERS is None:
+        _AUTH_HEADERS = {"Authorization": f"Bearer {JC_API_KEY}"}
+    return _AUTH_HEADERS
+
+
+def result_to_bytes(result: Any) -> Optional[bytes]:
     """
-    Best-effort pretty-print for MCP call_tool results.
-    CallToolResult is a Pydantic model → model_dump_json works.
+    Serialize a CallToolResult to pretty JSON bytes exactly once — the
+    same representation print_result emits and the disk cache stores, so
+    one serialization pass covers both. None when nothing worked.
+
+    Preferred path dumps the plain-dict tree with orjson straight to
+    bytes — no Pydantic JSON encoder, no UTF-8 re-encode of a giant str.
+    This dominates CLI CPU time for big devices_list / di_events_get
+    payloads.
     """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                result.model_dump(mode="json"), option=orjson.OPT_INDENT_2
+            )
+        except Exception:
+            pass  # e.g. daemon _RawResult, which only has model_dump_json
     try:
         # For MCP Python SDK v1.9+, all models have model_dump_json
-        print(result.model_dump_json(indent=2))
+        return result.model_dump_json(indent=2).encode()
     except Exception:
+        return None
+
+
+def _write_body(body: bytes) -> None:
+    sys.stdout.buffer.write(body)
+    sys.stdout.buffer.write(b"\n")
+    sys.stdout.buffer.flush()
+
+
+def print_result(result: Any) -> None:
+    """Best-effort pretty-print for MCP call_tool results."""
+    body = result_to_bytes(result)
+    if body is None:
         print(result)
+        return
+    _write_body(body)
+
+
+def print_ndjson(result: Any) -> None:
+    """
+    Line-delimited JSON output: one event (or one content item) per line,
+    written as compact bytes. Unlike print_result this never builds one
+    monolithic pretty-printed string, so memory stays flat for huge
+    di_events_get payloads and the output pipes straight into jq.
+    """
+    out = sys.stdout.buffer
+    if orjson is not None:
+        dumps = orjson.dumps
+    else:
+        def dumps(obj):
+            return json.dumps(obj, separators=(",", ":")).encode()
+
+    def emit(obj) -> None:
+        out.write(dumps(obj))
+        out.write(b"\n")
+
+    def emit_payload(parsed) -> None:
+        # Unwrap {"events": [...]} / bare lists into one object per line.
+        if isinstance(parsed, dict) and isinstance(parsed.get("events"), list):
+            parsed = parsed["events"]
+        if isinstance(parsed, list):
+            for evt in parsed:
+                emit(evt)
+        else:
+            emit(parsed)
+
+    structured = getattr(result, "structuredContent", None)
+    if isinstance(structured, dict):
+        emit_payload(structured)
+        out.flush()
+        return
+
+    if isinstance(result, _RawResult):
+        # Daemon responses arrive pre-serialized; re-parse once to split.
+        result = json.loads(result.model_dump_json(),
+                            object_hook=lambda d: SimpleNamespace(**d))
+
+    wrote = False
+    for item in getattr(result, "content", None) or []:
+        text = getattr(item, "text", None)
+        if isinstance(text, str):
+            try:
+                emit_payload(json.loads(text))
+                wrote = True
+                continue
+            except ValueError:
+                pass
+        try:
+            emit(item.model_dump(mode="json"))
+            wrote = True
+        except Exception:
+            pass
+        out.flush()  # first events are visible before the dump finishes
+
+    if not wrote:
+        print_result(result)
+        return
+    out.flush()
+
+
+def _http_client_factory(headers=None, timeout=None, auth=None):
+    """
+    httpx.AsyncClient factory handed to streamablehttp_client: request
+    HTTP/2 so batch/--all concurrency multiplexes over one TCP+TLS
+    connection (ALPN falls back to HTTP/1.1 when the server lacks h2),
+    and pin the pool to that single keepalive connection.
+    """
+    import httpx
+
+    # h2 is an optional httpx extra; constructing AsyncClient(http2=True)
+    # without it raises ImportError. Ask for HTTP/2 only when the package
+    # is importable, same idiom as the uvloop/orjson optionals.
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    kwargs: Dict[str, Any] = {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=1,
+            max_keepalive_connections=1,
+            # Keep the idle connection alive well past the 60 s keepalive
+            # pings the daemon sends, so reconnects are the rare case.
+            keepalive_expiry=300.0,
+        ),
+        "follow_redirects": True,
+    }
+    if headers is not None:
+        kwargs["headers"] = headers
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    if auth is not None:
+        kwargs["auth"] = auth
+    return httpx.AsyncClient(**kwargs)
+
+
+def _open_transport():
+    """
+    streamablehttp_client context manager with the HTTP/2 factory when
+    the installed SDK supports the hook, plain otherwise.
+    """
+    from mcp.client.streamable_http import streamablehttp_client
+
+    try:
+        return streamablehttp_client(
+            JC_MCP_URL,
+            headers=auth_headers(),
+            httpx_client_factory=_http_client_factory,
+        )
+    except TypeError:  # older SDK without httpx_client_factory
+        return streamablehttp_client(JC_MCP_URL, headers=auth_headers())
+
+
+class SessionHolder:
+    """
+    Keeps one MCP session open for the lifetime of the process (daemon
+    mode): the streamablehttp_client / ClientSession context managers are
+    entered on an AsyncExitStack that stays open until close().
+    """
+
+    def __init__(self):
+        self._stack: Optional[AsyncExitStack] = None
+        self.session: Optional["ClientSession"] = None
+
+    async def open(self) -> "ClientSession":
+        from mcp import ClientSession
+
+        stack = AsyncExitStack()
+        read, write, *_ = await stack.enter_async_context(_open_transport())
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        self._stack, self.session = stack, session
+        return session
+
+    async def close(self) -> None:
+        if self._stack is None:
+            return
+        stack, self._stack, self.session = self._stack, None, None
+        try:
+            await stack.aclose()
+        except Exception:
+            pass
+
+
+@asynccontextmanager
+async def open_session():
+    """
+    Yield one ready MCP session for embedding jc in a larger tool:
+
+        async with jc.open_session() as session:
+            await jc.cmd_users(args, session=session)
+            await jc.cmd_devices(args, session=session)
+
+    pays the TLS + initialize handshake once for any number of commands.
+    """
+    require_env()
+    holder = SessionHolder()
+    try:
+        yield await holder.open()
+    finally:
+        await holder.close()
+
+
+# ----------------- daemon wire protocol ----------------- #
+# Length-prefixed JSON frames over a local UNIX socket:
+#   request:  {"op": "call_tool", "tool": ..., "arguments": {...}}
+#             {"op": "list_tools"}
+#   response: {"ok": true, "body": "<result JSON>"} | {"ok": false, "error": ...}
 
+def _frame(payload: Dict[str, Any]) -> bytes:
+    body = json.dumps(payload).encode()
+    return struct.pack(">I", len(body)) + body
 
-async def with_session(run):
+
+async def _read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    header = await reader.readexactly(4)
+    (length,) = struct.unpack(">I", header)
+    return json.loads(await reader.readexactly(length))
+
+
+class _RawResult:
+    """
+    Stand-in for CallToolResult when the response arrives pre-serialized
+    from the daemon; print_result only needs model_dump_json. isError
+    travels as its own frame field so the cache layer can keep skipping
+    tool-error responses without parsing the body.
     """
-    Open a JumpCloud MCP session, run the given coroutine with it, then close.
+
+    def __init__(self, body: str, is_error: bool = False):
+        self._body = body
+        self.isError = is_error
+
+    def model_dump_json(self, indent: Optional[int] = None) -> str:
+        if indent is None:
+            return self._body
+        return json.dumps(json.loads(self._body), indent=indent)
+
+
+class DaemonSession:
     """
+    Thin client for a running `jc daemon`: forwards (tool, arguments) over
+    the UNIX socket so the TLS + initialize handshake is paid once by the
+    daemon instead of once per CLI invocation.
+    """
+
+    async def _roundtrip(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        reader, writer = await asyncio.open_unix_connection(DAEMON_SOCKET)
+        try:
+            writer.write(_frame(payload))
+            await writer.drain()
+            resp = await _read_frame(reader)
+        finally:
+            writer.close()
+        if not resp.get("ok"):
+            raise RuntimeError(resp.get("error", "jc daemon returned an error"))
+        return resp
+
+    async def call_tool(self, tool: str, arguments: Optional[Dict[str, Any]] = None):
+        resp = await self._roundtrip(
+            {"op": "call_tool", "tool": tool, "arguments": arguments}
+        )
+        return _RawResult(resp["body"], bool(resp.get("isError", False)))
+
+    async def list_tools(self):
+        resp = await self._roundtrip({"op": "list_tools"})
+        return json.loads(resp["body"], object_hook=lambda d: SimpleNamespace(**d))
+
+
+async def with_session(run, session=None, direct=False):
+    """
+    Run the given coroutine against a JumpCloud MCP session.
+
+    An explicitly injected session (see open_session) is used as-is; if a
+    `jc daemon` socket is present, forward through it (one shared
+    handshake); otherwise open a fresh session for this call, as before.
+    direct=True skips the daemon — for callers like pagination that need
+    to inspect real CallToolResult pages, not the daemon's pre-serialized
+    _RawResult bodies.
+    """
+    if session is not None:
+        return await run(session)
+
     require_env()
-    headers = {"Authorization": f"Bearer {JC_API_KEY}"}
 
-    async with streamablehttp_client(JC_MCP_URL, headers=headers) as (read, write, *_):
+    if not direct and os.path.exists(DAEMON_SOCKET):
+        try:
+            return await run(DaemonSession())
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Stale socket from a dead daemon; fall through to direct mode.
+            pass
+
+    from mcp import ClientSession
+
+    async with _open_transport() as (read, write, *_):
         async with ClientSession(read, write) as session:
             await session.initialize()
             return await run(session)
 
 
+# ----------------- request shapes ----------------- #
+
+# Frozen, slotted dataclasses instead of per-call dict literals: instances
+# are cheap to build, hashable (a stable dedup/cache key as (tool, req)),
+# and self-documenting. to_arguments() keeps the wire format identical by
+# dropping fields a given tool doesn't use.
+
+@dataclass(frozen=True, slots=True)
+class ListReq:
+    limit: int
+    skip: int
+    search: Optional[str] = None
+    searchTerm: Optional[str] = None
+    disabled: Optional[bool] = None
+    id: Optional[str] = None  # command-scoped lists (command_devices_list, ...)
+
+
+@dataclass(frozen=True, slots=True)
+class GetByIdReq:
+    id: str
+
+
+@dataclass(frozen=True, slots=True)
+class GroupMembersReq:
+    group_id: str
+    limit: int
+    skip: int
+
+
+@dataclass(frozen=True, slots=True)
+class DIEventsReq:
+    limit: int
+    service: str
+    event_type: str = ""
+    initiator_id: str = ""
+    query: str = ""
+    exact_match: str = ""
+    start_time: str = "7d"
+
+
+@functools.lru_cache(maxsize=256)
+def to_arguments(req: Any) -> Dict[str, Any]:
+    """
+    Dataclass request → call_tool arguments dict, omitting None fields.
+
+    Requests are frozen/hashable, so repeat calls (daemon loops, SWR
+    refreshes) reuse the memoized dict — callers treat it as read-only
+    and copy ({**args, ...}) when they need to override fields.
+    """
+    return {k: v for k, v in asdict(req).items() if v is not None}
+
+
+# ----------------- retries & circuit breaker ----------------- #
+
+# Consecutive-failure counts per tool; after _BREAKER_THRESHOLD failures
+# the breaker opens for _BREAKER_COOLDOWN seconds and calls fail fast
+# instead of hammering a struggling endpoint (the TTL cache then serves
+# its stale copy where one exists).
+_BREAKER_THRESHOLD = 5
+_BREAKER_COOLDOWN = 30.0
+_breaker: Dict[str, Dict[str, float]] = {}
+
+
+async def call_tool_resilient(
+    session,
+    tool: str,
+    arguments: Optional[Dict[str, Any]],
+    *,
+    retries: int = 3,
+    base: float = 0.25,
+    cap: float = 4.0,
+) -> Any:
+    """
+    session.call_tool with jittered exponential backoff on transport
+    errors (sleep min(cap, base*2**i) + jitter) and a per-tool circuit
+    breaker. A transient blip no longer costs the user a manual retry
+    plus another full TLS handshake.
+    """
+    state = _breaker.setdefault(tool, {"fails": 0, "open_until": 0.0})
+    if state["fails"] >= _BREAKER_THRESHOLD:
+        if time.monotonic() < state["open_until"]:
+            raise RuntimeError(
+                f"circuit breaker open for {tool!r}; retry in a few seconds"
+            )
+        state["fails"] = 0  # cooldown elapsed; probe again
+
+    last_exc: Optional[Exception] = None
+    for attempt in range(retries + 1):
+        try:
+            result = await session.call_tool(tool, arguments=arguments)
+        except Exception as e:
+            last_exc = e
+            state["fails"] += 1
+            if state["fails"] >= _BREAKER_THRESHOLD:
+                state["open_until"] = time.monotonic() + _BREAKER_COOLDOWN
+                break
+            if attempt < retries:
+                await asyncio.sleep(
+                    min(cap, base * 2 ** attempt) + random.random() * base
+                )
+            continue
+        state["fails"] = 0
+        return result
+    raise last_exc
+
+
+# ----------------- on-disk TTL response cache ----------------- #
+
+CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "jc-mcp"
+)
+
+# Per-tool (fresh_ttl, stale_ttl) in seconds. Within fresh_ttl a cached
+# response is returned as-is; between fresh_ttl and stale_ttl it is still
+# returned instantly but a background refresh is kicked off
+# (stale-while-revalidate); past stale_ttl it only serves as the
+# stale-on-error fallback. (0, 0) disables caching entirely —
+# di_events_get and search_api must always hit the server.
+CACHE_POLICY: Dict[str, tuple] = {
+    "admins_list": (60, 300),
+    "users_list": (30, 120),
+    "user_get": (15, 60),
+    "user_groups_list": (60, 300),
+    "user_group_membership": (30, 120),
+    "applications_list": (60, 300),
+    "application_get": (15, 60),
+    "devices_list": (30, 120),
+    "device_get": (15, 60),
+    "device_groups_list": (60, 300),
+    "device_group_membership": (30, 120),
+    "commands_list": (30, 120),
+    "command_get": (15, 60),
+    "command_devices_list": (30, 120),
+    "command_device_groups_list": (30, 120),
+    "command_result_list": (10, 30),
+    "commandresults_list": (10, 30),
+    "policies_list": (60, 300),
+    "policy_get": (15, 60),
+    "softwareapp_list": (60, 300),
+    "di_events_get": (0, 0),
+    "search_api": (0, 0),
+}
+
+
+def _canonical_bytes(arguments: Optional[Dict[str, Any]]) -> bytes:
+    """Sorted-key JSON bytes for an arguments dict — the canonical form
+    shared by the cache key and the daemon's single-flight key."""
+    if orjson is not None:
+        return orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(arguments, sort_keys=True).encode()
+
+
+# Each command touches its cache file up to three times (freshness probe,
+# stale fallback, write); memoize the digest so the canonical JSON and
+# blake2b run once per distinct request rather than once per touch.
+@functools.lru_cache(maxsize=512)
+def _cache_key(tool: str, items: tuple) -> str:
+    return hashlib.blake2b(
+        _canonical_bytes(dict(items)) + tool.encode(), digest_size=16
+    ).hexdigest()
+
+
+def _cache_path(tool: str, arguments: Dict[str, Any]) -> str:
+    key = _cache_key(tool, tuple(sorted(arguments.items())))
+    return os.path.join(CACHE_DIR, f"{tool}-{key}.json")
+
+
+# Cache file layout: one JSON header line ({generated_at, fresh_until,
+# stale_until}) followed by the response body verbatim, as the bytes the
+# first call serialized. A hit is read + write — no JSON parse of the
+# body and no Pydantic model reconstruction.
+
+def _cache_envelope(tool: str, arguments: Dict[str, Any]) -> Optional[tuple]:
+    try:
+        with open(_cache_path(tool, arguments), "rb") as f:
+            header = json.loads(f.readline())
+            body = f.read()
+    except (OSError, ValueError):
+        return None
+    if not isinstance(header, dict) or not body:
+        return None  # legacy/corrupt entry; treat as a miss
+    return header, body
+
+
+def _cache_read(
+    tool: str, arguments: Dict[str, Any], allow_stale: bool = False
+) -> Optional[bytes]:
+    envelope = _cache_envelope(tool, arguments)
+    if envelope is None:
+        return None
+    header, body = envelope
+    if allow_stale or time.time() < header.get("fresh_until", 0):
+        return body
+    return None
+
+
+def _cache_write(tool: str, arguments: Dict[str, Any], body: bytes) -> None:
+    fresh_ttl, stale_ttl = CACHE_POLICY.get(tool, (0, 0))
+    if not fresh_ttl:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _cache_path(tool, arguments)
+        now = time.time()
+        header = {
+            "generated_at": now,
+            "fresh_until": now + fresh_ttl,
+            "stale_until": now + stale_ttl,
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode())
+            f.write(b"\n")
+            f.write(body)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # caching is best-effort; never fail the command over it
+
+
+# Stale-while-revalidate refreshes run as background tasks; _run_cli
+# drains this set before the loop closes so refreshed bodies land on disk.
+_BG_TASKS: set = set()
+
+
+async def _refresh_cache(tool: str, arguments: Dict[str, Any]) -> None:
+    try:
+        async def inner(session):
+            return await call_tool_resilient(session, tool, arguments)
+
+        result = await with_session(inner)
+        if not getattr(result, "isError", False):
+            body = result_to_bytes(result)
+            if body is not None:
+                _cache_write(tool, arguments, body)
+    except Exception:
+        pass  # refresh is opportunistic; the next caller retries anyway
+
+
+def _spawn_refresh(tool: str, arguments: Dict[str, Any]) -> None:
+    task = asyncio.create_task(_refresh_cache(tool, arguments))
+    _BG_TASKS.add(task)
+    task.add_done_callback(_BG_TASKS.discard)
+
+
+# In-memory layer in front of the disk cache, for repeat calls within one
+# process (open_session scripts, SWR refresh loops). Keys pack the small
+# integer arguments into one uint64 — a few shifts instead of JSON + hash
+# — with any string arguments tagging along in a tuple.
+
+TOOL_IDS: Dict[str, int] = {tool: i for i, tool in enumerate(CACHE_POLICY, start=1)}
+
+_MEM_CACHE: Dict[Any, tuple] = {}  # key -> (fresh_until, body bytes)
+_MEM_CACHE_MAX = 256
+
+
+# Field widths in the packed key: limit gets 16 bits, skip 31. Values
+# beyond these make _mem_key decline (returning None) rather than mask —
+# masking would collide distinct requests onto one cached body.
+_PACK_LIMIT_MAX = 0xFFFF
+_PACK_SKIP_MAX = 0x7FFFFFFF
+
+
+def pack_list_key(tool_id: int, limit: int, skip: int, disabled: bool) -> int:
+    return (tool_id << 48) | (limit << 32) | (skip << 1) | int(disabled)
+
+
+def _mem_key(tool: str, arguments: Dict[str, Any]) -> Optional[Any]:
+    tool_id = TOOL_IDS.get(tool)
+    if tool_id is None:
+        return None
+    try:
+        limit = int(arguments.get("limit") or 0)
+        skip = int(arguments.get("skip") or 0)
+    except (TypeError, ValueError):
+        return None
+    if not (0 <= limit <= _PACK_LIMIT_MAX and 0 <= skip <= _PACK_SKIP_MAX):
+        return None
+    packed = pack_list_key(tool_id, limit, skip, bool(arguments.get("disabled")))
+    extras = tuple(
+        (k, v) for k, v in arguments.items()
+        if k not in ("limit", "skip", "disabled")
+    )
+    return (packed, extras) if extras else packed
+
+
+def _mem_get(key: Any) -> Optional[bytes]:
+    entry = _MEM_CACHE.get(key)
+    if entry is None:
+        return None
+    fresh_until, body = entry
+    if time.time() >= fresh_until:
+        del _MEM_CACHE[key]
+        return None
+    return body
+
+
+def _mem_put(key: Any, fresh_until: float, body: bytes) -> None:
+    if key is None:
+        return
+    if len(_MEM_CACHE) >= _MEM_CACHE_MAX:
+        _MEM_CACHE.pop(next(iter(_MEM_CACHE)))
+    _MEM_CACHE[key] = (fresh_until, body)
+
+
+async def cached_tool_call(
+    tool: str, arguments: Dict[str, Any], session=None
+) -> None:
+    """
+    call_tool + print_result with the per-tool disk cache in front:
+    a fresh hit prints the stored body and never opens a session; a
+    stale-but-serviceable hit prints the stored body and refreshes it in
+    the background; on MCP errors the last known body is the fallback.
+    """
+    fresh_ttl, stale_ttl = CACHE_POLICY.get(tool, (0, 0))
+    mem_key = _mem_key(tool, arguments) if fresh_ttl else None
+    if mem_key is not None:
+        body = _mem_get(mem_key)
+        if body is not None:
+            _write_body(body)
+            return
+    if fresh_ttl:
+        envelope = _cache_envelope(tool, arguments)
+        if envelope is not None:
+            header, body = envelope
+            now = time.time()
+            if now < header.get("fresh_until", 0):
+                _write_body(body)
+                _mem_put(mem_key, header["fresh_until"], body)
+                return
+            if now < header.get("stale_until", 0):
+                _write_body(body)
+                _spawn_refresh(tool, arguments)
+                return
+
+    async def inner(session):
+        return await call_tool_resilient(session, tool, arguments)
+
+    try:
+        result = await with_session(inner, session)
+    except Exception:
+        body = _cache_read(tool, arguments, allow_stale=True)
+        if body is not None:
+            print("X-Cache: STALE (MCP unreachable, serving last known response)",
+                  file=sys.stderr)
+            _write_body(body)
+            return
+        raise
+
+    # Serialize once; the same bytes go to stdout and (on success) to disk.
+    body = result_to_bytes(result)
+    if body is None:
+        print(result)
+        return
+    _write_body(body)
+    if not getattr(result, "isError", False):
+        _cache_write(tool, arguments, body)
+        if fresh_ttl:
+            _mem_put(mem_key, time.time() + fresh_ttl, body)
+
+
+# ----------------- batched calls ----------------- #
+
+async def gather_limited(coros, limit: int = 8):
+    """
+    asyncio.gather with a concurrency cap: at most `limit` of the given
+    coroutines run at once. Results come back in input order, like gather.
+    """
+    sem = asyncio.Semaphore(limit)
+
+    async def _wrap(coro):
+        async with sem:
+            return await coro
+
+    return await asyncio.gather(*(_wrap(c) for c in coros))
+
+
+def _page_rows(result: Any) -> Optional[list]:
+    """
+    Best-effort list of rows from one page of a *_list call. Returns None
+    when the payload shape is unrecognized.
+    """
+    payload = getattr(result, "structuredContent", None)
+    if not isinstance(payload, dict):
+        payload = None
+        for item in getattr(result, "content", None) or []:
+            text = getattr(item, "text", None)
+            if not isinstance(text, str):
+                continue
+            try:
+                parsed = json.loads(text)
+            except ValueError:
+                continue
+            if isinstance(parsed, list):
+                return parsed
+            if isinstance(parsed, dict):
+                payload = parsed
+                break
+    if payload is None:
+        return None
+    rows = payload.get("results")
+    return rows if isinstance(rows, list) else None
+
+
+def _page_count(result: Any) -> Optional[int]:
+    """Row count for one page, so pagination can spot the last (short) page."""
+    rows = _page_rows(result)
+    return None if rows is None else len(rows)
+
+
+# Tools whose upstream API orders by id and accepts a keyset cursor. Deep
+# integer skip makes the server re-scan O(skip) records per page; asking
+# for rows after the previous page's last id keeps every page O(page).
+CURSOR_TOOLS: Dict[str, str] = {
+    "users_list": "_id",
+    "devices_list": "_id",
+    "applications_list": "_id",
+    "policies_list": "_id",
+    "commands_list": "_id",
+}
+
+
+async def paginate_cursor(
+    session,
+    tool: str,
+    base_args: Dict[str, Any],
+    id_field: str = "_id",
+    page_size: int = 100,
+) -> Any:
+    """
+    Keyset pagination: pages are fetched serially, each continuing after
+    the previous page's last id. Raises when the tool rejects the cursor
+    or rows carry no id, so the caller can fall back to skip offsets.
+    """
+    merged = None
+    after: Optional[str] = None
+    while True:
+        arguments = {**base_args, "limit": page_size}
+        if after is not None:
+            arguments["after"] = after
+        page = await call_tool_resilient(session, tool, arguments)
+        if getattr(page, "isError", False):
+            raise RuntimeError(f"{tool} rejected cursor pagination")
+        rows = _page_rows(page)
+        if rows is None:
+            raise RuntimeError(f"{tool} page shape unrecognized for cursor mode")
+        if merged is None:
+            merged = page
+        elif rows:
+            content = getattr(page, "content", None)
+            if content:
+                merged.content.extend(content)
+        if len(rows) < page_size:
+            return merged
+        last = rows[-1].get(id_field) if isinstance(rows[-1], dict) else None
+        if last is None:
+            raise RuntimeError(f"{tool} rows carry no {id_field!r} cursor")
+        if last == after:
+            # The tool ignored the cursor and served the same page again;
+            # raise so the caller falls back to skip offsets instead of
+            # looping forever.
+            raise RuntimeError(f"{tool} cursor did not advance past {after!r}")
+        after = last
+
+
+async def paginate_all(
+    tool: str,
+    base_args: Dict[str, Any],
+    page_size: int = 100,
+    concurrency: int = 8,
+    session=None,
+) -> Any:
+    """
+    Fetch every page of a *_list tool over one session.
+
+    Tools in CURSOR_TOOLS are tried keyset-style first (cheap for the
+    server at any depth); everything else — or a failed cursor attempt —
+    is fetched in waves of `concurrency` concurrent calls at skip
+    offsets 0, P, 2P, ..., where a short or empty page marks the end.
+    The pages' content lists are merged into one result for printing.
+    """
+
+    async def inner(session):
+        id_field = CURSOR_TOOLS.get(tool)
+        if id_field is not None:
+            try:
+                return await paginate_cursor(
+                    session, tool, base_args,
+                    id_field=id_field, page_size=page_size,
+                )
+            except Exception:
+                pass  # tool doesn't really support cursors; use offsets
+
+        merged = None
+        skip = 0
+        while True:
+            pages = await gather_limited(
+                [
+                    call_tool_resilient(session, tool, {
+                        **base_args,
+                        "limit": page_size,
+                        "skip": skip + i * page_size,
+                    })
+                    for i in range(concurrency)
+                ],
+                limit=concurrency,
+            )
+            done = False
+            for page in pages:
+                count = _page_count(page)
+                if merged is None:
+                    merged = page
+                elif count != 0:
+                    content = getattr(page, "content", None)
+                    if content:
+                        merged.content.extend(content)
+                if count == 0 or (count is not None and count < page_size):
+                    done = True
+                    break
+                if count is None:
+                    # Unknown shape: don't risk an infinite loop.
+                    done = True
+                    break
+            if done:
+                return merged
+            skip += concurrency * page_size
+
+    # Always talk to MCP directly: daemon responses are _RawResult blobs
+    # whose pages _page_rows can't inspect, which would silently end
+    # pagination after the first wave.
+    return await with_session(inner, session, direct=True)
+
+
+async def list_tool_call(args: argparse.Namespace, tool: str, req: Any,
+                         session=None) -> None:
+    """
+    Shared entry for *_list commands: --all paginates the whole
+    collection concurrently (overriding the request's limit/skip per
+    page), otherwise it is a single cached page.
+    """
+    arguments = to_arguments(req)
+    if getattr(args, "all", False):
+        print_result(await paginate_all(tool, arguments, session=session))
+        return
+    await cached_tool_call(tool, arguments, session=session)
+
+
+async def cmd_batch(args: argparse.Namespace, session=None) -> None:
+    """
+    Run many tool calls from a JSON file over one MCP session.
+
+    The file is a list of {"tool": "...", "arguments": {...}} entries;
+    one TLS handshake is amortized over all of them and calls run
+    concurrently (bounded by --concurrency). Results print in file order.
+    """
+    try:
+        with open(args.file) as f:
+            calls = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: could not read batch file {args.file}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not isinstance(calls, list):
+        print("ERROR: batch file must be a JSON list of "
+              '{"tool": ..., "arguments": {...}} entries', file=sys.stderr)
+        sys.exit(1)
+
+    async def inner(session):
+        return await gather_limited(
+            [
+                call_tool_resilient(session, c["tool"], c.get("arguments") or {})
+                for c in calls
+            ],
+            limit=args.concurrency,
+        )
+
+    results = await with_session(inner, session)
+    for call, result in zip(calls, results):
+        print(f"=== {call['tool']} {json.dumps(call.get('arguments') or {})} ===")
+        print_result(result)
+
+
+# ----------------- daemon mode ----------------- #
+
+async def cmd_daemon(args: argparse.Namespace, session=None) -> None:
+    """
+    Hold one authenticated MCP session open and serve (tool, arguments)
+    requests from other jc invocations over a local UNIX socket.
+    """
+    require_env()
+    holder = SessionHolder()
+    await holder.open()
+
+    # Warm call: DNS, TLS and ALPN are all negotiated before the first
+    # client connects, so the first user-visible request is already fast.
+    try:
+        await holder.session.list_tools()
+    except Exception:
+        pass
+
+    reconnect_lock = asyncio.Lock()
+
+    async def reconnect(failed) -> None:
+        # Identity-guarded like the bots' session drop: only the caller
+        # whose session actually died reopens; everyone else who raced in
+        # behind it finds a fresh session already in place.
+        async with reconnect_lock:
+            if holder.session is failed:
+                await holder.close()
+                await holder.open()
+
+    async def keepalive() -> None:
+        # A lightweight list_tools every 60 s keeps the connection (and
+        # any TLS session state) hot instead of paying idle-closure
+        # reconnects on the next real request.
+        while True:
+            await asyncio.sleep(60)
+            session = holder.session
+            try:
+                await session.list_tools()
+            except Exception:
+                try:
+                    await reconnect(session)
+                except Exception:
+                    # Upstream still down; the next tick (or a client
+                    # request) retries the reopen.
+                    pass
+
+    keepalive_task = asyncio.create_task(keepalive())
+
+    # Single-flight map: concurrent identical requests (same tool, same
+    # canonical arguments) share one upstream RPC — the second caller just
+    # awaits the first one's future instead of issuing its own call.
+    inflight: Dict[Any, asyncio.Future] = {}
+
+    async def call_upstream(session, req: Dict[str, Any]):
+        if req.get("op") == "list_tools":
+            return await session.list_tools()
+        return await session.call_tool(req["tool"], arguments=req.get("arguments"))
+
+    async def dispatch(req: Dict[str, Any]) -> Dict[str, Any]:
+        session = holder.session
+        try:
+            result = await call_upstream(session, req)
+        except Exception:
+            # Connection is likely broken; reopen it and retry once so a
+            # dead upstream session doesn't fail every frame until the
+            # daemon is restarted by hand.
+            await reconnect(session)
+            result = await call_upstream(holder.session, req)
+        return {
+            "ok": True,
+            "body": result.model_dump_json(),
+            "isError": bool(getattr(result, "isError", False)),
+        }
+
+    async def dispatch_shared(req: Dict[str, Any]) -> Dict[str, Any]:
+        if req.get("op") == "list_tools":
+            key: Any = "list_tools"
+        else:
+            key = (req.get("tool"), _canonical_bytes(req.get("arguments")))
+        fut = inflight.get(key)
+        if fut is not None:
+            return await asyncio.shield(fut)
+        fut = asyncio.get_running_loop().create_future()
+        inflight[key] = fut
+        try:
+            resp = await dispatch(req)
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved; waiters still see the raise
+            raise
+        else:
+            fut.set_result(resp)
+            return resp
+        finally:
+            inflight.pop(key, None)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    req = await _read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionResetError):
+                    break
+                try:
+                    resp = await dispatch_shared(req)
+                except Exception as e:
+                    resp = {"ok": False, "error": str(e)}
+                writer.write(_frame(resp))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    if os.path.exists(DAEMON_SOCKET):
+        os.unlink(DAEMON_SOCKET)
+    server = await asyncio.start_unix_server(handle, path=DAEMON_SOCKET)
+    print(f"jc-mcp daemon listening on {DAEMON_SOCKET}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        keepalive_task.cancel()
+        try:
+            os.unlink(DAEMON_SOCKET)
+        except OSError:
+            pass
+        await holder.close()
+
+
 # ----------------- commands (viewer-only tools) ----------------- #
 
-async def cmd_tools(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
+async def cmd_tools(args: argparse.Namespace, session=None) -> None:
+    async def inner(session):
         tools_resp = await session.list_tools()
         print("Available tools:")
         for tool in tools_resp.tools:
@@ -60,431 +1082,453 @@ async def cmd_tools(args: argparse.Namespace) -> None:
             if tool.description:
                 line += f": {tool.description}"
             print(line)
-    await with_session(inner)
+    await with_session(inner, session)
 
 
 # --- admins_list --- #
 
-async def cmd_admins(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "skip": args.skip,
-            "search": args.search or "",
-        }
-        result = await session.call_tool("admins_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_admins(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "admins_list",
+                         ListReq(args.limit, args.skip, search=args.search or ""),
+                         session=session)
 
 
 # --- users_list / user_get --- #
 
-async def cmd_users(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "skip": args.skip,
-            "searchTerm": args.searchTerm or "",
-        }
-        result = await session.call_tool("users_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_users(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "users_list",
+                         ListReq(args.limit, args.skip,
+                                 searchTerm=args.searchTerm or ""),
+                         session=session)
 
 
-async def cmd_user_get(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        # schema: { "id": "user_id" }
-        result = await session.call_tool("user_get", arguments={"id": args.id})
-        print_result(result)
-    await with_session(inner)
+async def cmd_user_get(args: argparse.Namespace, session=None) -> None:
+    # schema: { "id": "user_id" }
+    await cached_tool_call("user_get", to_arguments(GetByIdReq(args.id)), session=session)
 
 
 # --- user_groups_list / user_group_membership --- #
 
-async def cmd_user_groups(args: argparse.Namespace) -> None:
+async def cmd_user_groups(args: argparse.Namespace, session=None) -> None:
     """
     Lists all user groups (not groups-for-user, but org-wide user groups).
     """
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "skip": args.skip,
-            "search": args.search or "",
-            "disabled": args.disabled,
-        }
-        result = await session.call_tool("user_groups_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+    await list_tool_call(args, "user_groups_list",
+                         ListReq(args.limit, args.skip,
+                                 search=args.search or "",
+                                 disabled=args.disabled),
+                         session=session)
 
 
-async def cmd_user_group_members(args: argparse.Namespace) -> None:
+async def cmd_user_group_members(args: argparse.Namespace, session=None) -> None:
     """
     Lists users in a specific user group.
     """
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "group_id": args.group_id,
-            "limit": args.limit,
-            "skip": args.skip,
-        }
-        result = await session.call_tool("user_group_membership", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+    await list_tool_call(args, "user_group_membership",
+                         GroupMembersReq(args.group_id, args.limit, args.skip),
+                         session=session)
 
 
 # --- applications_list / application_get --- #
 
-async def cmd_apps(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "skip": args.skip,
-            "search": args.search or "",
-        }
-        result = await session.call_tool("applications_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_apps(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "applications_list",
+                         ListReq(args.limit, args.skip, search=args.search or ""),
+                         session=session)
 
 
-async def cmd_app_get(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        result = await session.call_tool("application_get", arguments={"id": args.id})
-        print_result(result)
-    await with_session(inner)
+async def cmd_app_get(args: argparse.Namespace, session=None) -> None:
+    await cached_tool_call("application_get", to_arguments(GetByIdReq(args.id)), session=session)
 
 
 # --- devices_list / device_get / device_groups_list / device_group_membership --- #
 
-async def cmd_devices(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "skip": args.skip,
-            "search": args.search or "",
-        }
-        result = await session.call_tool("devices_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_devices(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "devices_list",
+                         ListReq(args.limit, args.skip, search=args.search or ""),
+                         session=session)
 
 
-async def cmd_device_get(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        result = await session.call_tool("device_get", arguments={"id": args.id})
-        print_result(result)
-    await with_session(inner)
+async def cmd_device_get(args: argparse.Namespace, session=None) -> None:
+    await cached_tool_call("device_get", to_arguments(GetByIdReq(args.id)), session=session)
 
 
-async def cmd_device_groups(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "skip": args.skip,
-            "search": args.search or "",
-            "disabled": args.disabled,
-        }
-        result = await session.call_tool("device_groups_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_device_groups(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "device_groups_list",
+                         ListReq(args.limit, args.skip,
+                                 search=args.search or "",
+                                 disabled=args.disabled),
+                         session=session)
 
 
-async def cmd_device_group_members(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "group_id": args.group_id,
-            "limit": args.limit,
-            "skip": args.skip,
-        }
-        result = await session.call_tool("device_group_membership", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_device_group_members(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "device_group_membership",
+                         GroupMembersReq(args.group_id, args.limit, args.skip),
+                         session=session)
 
 
 # --- commands & results --- #
 
-async def cmd_commands(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "skip": args.skip,
-        }
-        result = await session.call_tool("commands_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_commands(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "commands_list", ListReq(args.limit, args.skip), session=session)
 
 
-async def cmd_command_get(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        result = await session.call_tool("command_get", arguments={"id": args.id})
-        print_result(result)
-    await with_session(inner)
+async def cmd_command_get(args: argparse.Namespace, session=None) -> None:
+    await cached_tool_call("command_get", to_arguments(GetByIdReq(args.id)), session=session)
 
 
-async def cmd_command_devices(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "id": args.id,
-            "limit": args.limit,
-            "skip": args.skip,
-        }
-        result = await session.call_tool("command_devices_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_command_devices(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "command_devices_list",
+                         ListReq(args.limit, args.skip, id=args.id),
+                         session=session)
 
 
-async def cmd_command_device_groups(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "id": args.id,
-            "limit": args.limit,
-            "skip": args.skip,
-        }
-        result = await session.call_tool("command_device_groups_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_command_device_groups(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "command_device_groups_list",
+                         ListReq(args.limit, args.skip, id=args.id),
+                         session=session)
 
 
-async def cmd_command_results(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "id": args.id,
-            "limit": args.limit,
-            "skip": args.skip,
-        }
-        result = await session.call_tool("command_result_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_command_results(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "command_result_list",
+                         ListReq(args.limit, args.skip, id=args.id),
+                         session=session)
 
 
-async def cmd_commandresults(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "skip": args.skip,
-        }
-        result = await session.call_tool("commandresults_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_commandresults(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "commandresults_list", ListReq(args.limit, args.skip), session=session)
 
 
 # --- policies & software --- #
 
-async def cmd_policies(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "skip": args.skip,
-            "search": args.search or "",
-        }
-        result = await session.call_tool("policies_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_policies(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "policies_list",
+                         ListReq(args.limit, args.skip, search=args.search or ""),
+                         session=session)
 
 
-async def cmd_policy_get(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        result = await session.call_tool("policy_get", arguments={"id": args.id})
-        print_result(result)
-    await with_session(inner)
+async def cmd_policy_get(args: argparse.Namespace, session=None) -> None:
+    await cached_tool_call("policy_get", to_arguments(GetByIdReq(args.id)), session=session)
 
 
-async def cmd_software(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "skip": args.skip,
-        }
-        result = await session.call_tool("softwareapp_list", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_software(args: argparse.Namespace, session=None) -> None:
+    await list_tool_call(args, "softwareapp_list", ListReq(args.limit, args.skip), session=session)
 
 
 # --- DI events --- #
 
-async def cmd_di_events(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "limit": args.limit,
-            "service": args.service,
-            "event_type": args.event_type or "",
-            "initiator_id": args.initiator_id or "",
-            "query": args.query or "",
-            "exact_match": args.exact_match or "",
-            "start_time": args.start_time,
-        }
-        result = await session.call_tool("di_events_get", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_di_events(args: argparse.Namespace, session=None) -> None:
+    arguments = to_arguments(DIEventsReq(
+        limit=args.limit,
+        service=args.service,
+        event_type=args.event_type or "",
+        initiator_id=args.initiator_id or "",
+        query=args.query or "",
+        exact_match=args.exact_match or "",
+        start_time=args.start_time,
+    ))
+    if args.ndjson:
+        async def inner(session):
+            return await call_tool_resilient(session, "di_events_get", arguments)
+        print_ndjson(await with_session(inner, session))
+        return
+    # CACHE_POLICY keeps audit events uncacheable; this still goes through
+    # cached_tool_call for the uniform call path.
+    await cached_tool_call("di_events_get", arguments, session=session)
 
 
 # --- search_api (natural language) --- #
 
-async def cmd_search_api(args: argparse.Namespace) -> None:
-    async def inner(session: ClientSession):
-        arguments: Dict[str, Any] = {
-            "query": args.query,
-        }
-        result = await session.call_tool("search_api", arguments=arguments)
-        print_result(result)
-    await with_session(inner)
+async def cmd_search_api(args: argparse.Namespace, session=None) -> None:
+    if args.ndjson:
+        async def inner(session):
+            return await call_tool_resilient(session, "search_api",
+                                             {"query": args.query})
+        print_ndjson(await with_session(inner, session))
+        return
+    await cached_tool_call("search_api", {
+        "query": args.query,
+    }, session=session)
 
 
 # ----------------- argparse wiring ----------------- #
 
-def build_parser() -> argparse.ArgumentParser:
+def _add_paging(p: argparse.ArgumentParser, limit: int = 10) -> None:
+    p.add_argument("--limit", type=int, default=limit)
+    p.add_argument("--skip", type=int, default=0)
+    p.add_argument("--all", action="store_true",
+                   help="Fetch every page concurrently")
+
+
+def _sub_tools(sub) -> None:
+    p = sub.add_parser("tools", help="List MCP tools exposed by JumpCloud")
+    p.set_defaults(func=cmd_tools)
+
+
+def _sub_daemon(sub) -> None:
+    p = sub.add_parser(
+        "daemon",
+        help="Keep one MCP session open and serve other jc invocations over a local socket",
+    )
+    p.set_defaults(func=cmd_daemon)
+
+
+def _sub_batch(sub) -> None:
+    p = sub.add_parser(
+        "batch",
+        help="Run many tool calls from a JSON file over one session",
+    )
+    p.add_argument("file", help='JSON list of {"tool": ..., "arguments": {...}}')
+    p.add_argument("--concurrency", type=int, default=8,
+                   help="Max tool calls in flight at once")
+    p.set_defaults(func=cmd_batch)
+
+
+def _sub_admins(sub) -> None:
+    p = sub.add_parser("admins", help="List JumpCloud console admins")
+    _add_paging(p)
+    p.add_argument("--search", type=str, default="")
+    p.set_defaults(func=cmd_admins)
+
+
+def _sub_users(sub) -> None:
+    p = sub.add_parser("users", help="List JumpCloud users")
+    _add_paging(p)
+    p.add_argument("--searchTerm", type=str, default="")
+    p.set_defaults(func=cmd_users)
+
+
+def _sub_user_get(sub) -> None:
+    p = sub.add_parser("user-get", help="Get a specific user by ID")
+    p.add_argument("--id", required=True)
+    p.set_defaults(func=cmd_user_get)
+
+
+def _sub_user_groups(sub) -> None:
+    p = sub.add_parser("user-groups", help="List all user groups")
+    _add_paging(p)
+    p.add_argument("--search", type=str, default="")
+    p.add_argument("--disabled", action="store_true")
+    p.set_defaults(func=cmd_user_groups)
+
+
+def _sub_user_group_members(sub) -> None:
+    p = sub.add_parser("user-group-members", help="List members of a user group")
+    p.add_argument("--group-id", required=True)
+    _add_paging(p)
+    p.set_defaults(func=cmd_user_group_members)
+
+
+def _sub_apps(sub) -> None:
+    p = sub.add_parser("apps", help="List SSO applications")
+    _add_paging(p)
+    p.add_argument("--search", type=str, default="")
+    p.set_defaults(func=cmd_apps)
+
+
+def _sub_app_get(sub) -> None:
+    p = sub.add_parser("app-get", help="Get a specific application by ID")
+    p.add_argument("--id", required=True)
+    p.set_defaults(func=cmd_app_get)
+
+
+def _sub_devices(sub) -> None:
+    p = sub.add_parser("devices", help="List devices")
+    _add_paging(p)
+    p.add_argument("--search", type=str, default="")
+    p.set_defaults(func=cmd_devices)
+
+
+def _sub_device_get(sub) -> None:
+    p = sub.add_parser("device-get", help="Get a device by ID")
+    p.add_argument("--id", required=True)
+    p.set_defaults(func=cmd_device_get)
+
+
+def _sub_device_groups(sub) -> None:
+    p = sub.add_parser("device-groups", help="List device groups")
+    _add_paging(p)
+    p.add_argument("--search", type=str, default="")
+    p.add_argument("--disabled", action="store_true")
+    p.set_defaults(func=cmd_device_groups)
+
+
+def _sub_device_group_members(sub) -> None:
+    p = sub.add_parser("device-group-members", help="List members of a device group")
+    p.add_argument("--group-id", required=True)
+    _add_paging(p)
+    p.set_defaults(func=cmd_device_group_members)
+
+
+def _sub_commands(sub) -> None:
+    p = sub.add_parser("commands", help="List commands (scripts)")
+    _add_paging(p)
+    p.set_defaults(func=cmd_commands)
+
+
+def _sub_command_get(sub) -> None:
+    p = sub.add_parser("command-get", help="Get a specific command by ID")
+    p.add_argument("--id", required=True)
+    p.set_defaults(func=cmd_command_get)
+
+
+def _sub_command_devices(sub) -> None:
+    p = sub.add_parser("command-devices", help="List devices a command runs on")
+    p.add_argument("--id", required=True, help="Command ID")
+    _add_paging(p)
+    p.set_defaults(func=cmd_command_devices)
+
+
+def _sub_command_device_groups(sub) -> None:
+    p = sub.add_parser("command-device-groups", help="List device groups for a command")
+    p.add_argument("--id", required=True, help="Command ID")
+    _add_paging(p)
+    p.set_defaults(func=cmd_command_device_groups)
+
+
+def _sub_command_results(sub) -> None:
+    p = sub.add_parser("command-results", help="List results for a specific command")
+    p.add_argument("--id", required=True, help="Command ID")
+    _add_paging(p)
+    p.set_defaults(func=cmd_command_results)
+
+
+def _sub_commandresults(sub) -> None:
+    p = sub.add_parser("commandresults", help="List recent command results across all commands")
+    _add_paging(p)
+    p.set_defaults(func=cmd_commandresults)
+
+
+def _sub_policies(sub) -> None:
+    p = sub.add_parser("policies", help="List security/configuration policies")
+    _add_paging(p)
+    p.add_argument("--search", type=str, default="")
+    p.set_defaults(func=cmd_policies)
+
+
+def _sub_policy_get(sub) -> None:
+    p = sub.add_parser("policy-get", help="Get a specific policy by ID")
+    p.add_argument("--id", required=True)
+    p.set_defaults(func=cmd_policy_get)
+
+
+def _sub_software(sub) -> None:
+    p = sub.add_parser("software", help="List managed software applications")
+    _add_paging(p)
+    p.set_defaults(func=cmd_software)
+
+
+def _sub_di_events(sub) -> None:
+    p = sub.add_parser("di-events", help="Fetch Directory Insights events (audit logs)")
+    p.add_argument("--service", type=str, default="all",
+                   help="Service (asset_management, sso, systems, all, etc.)")
+    p.add_argument("--event-type", type=str, default="")
+    p.add_argument("--initiator-id", type=str, default="")
+    p.add_argument("--query", type=str, default="")
+    p.add_argument("--exact-match", type=str, default="")
+    p.add_argument("--start-time", type=str, default="7d",
+                   help="Duration (e.g., 7d) or ISO8601 start time")
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--ndjson", action="store_true",
+                   help="Emit one event per line instead of one pretty JSON blob")
+    p.set_defaults(func=cmd_di_events)
+
+
+def _sub_search_api(sub) -> None:
+    p = sub.add_parser("search-api", help="Use AI-powered search_api with natural language")
+    p.add_argument("query", type=str, help="Natural-language question")
+    p.add_argument("--ndjson", action="store_true",
+                   help="Emit one result object per line instead of one pretty JSON blob")
+    p.set_defaults(func=cmd_search_api)
+
+
+# One small builder per subcommand so build_parser can register exactly the
+# parser the invocation needs instead of all ~20 of them.
+_SUBCOMMANDS = {
+    "tools": _sub_tools,
+    "daemon": _sub_daemon,
+    "batch": _sub_batch,
+    "admins": _sub_admins,
+    "users": _sub_users,
+    "user-get": _sub_user_get,
+    "user-groups": _sub_user_groups,
+    "user-group-members": _sub_user_group_members,
+    "apps": _sub_apps,
+    "app-get": _sub_app_get,
+    "devices": _sub_devices,
+    "device-get": _sub_device_get,
+    "device-groups": _sub_device_groups,
+    "device-group-members": _sub_device_group_members,
+    "commands": _sub_commands,
+    "command-get": _sub_command_get,
+    "command-devices": _sub_command_devices,
+    "command-device-groups": _sub_command_device_groups,
+    "command-results": _sub_command_results,
+    "commandresults": _sub_commandresults,
+    "policies": _sub_policies,
+    "policy-get": _sub_policy_get,
+    "software": _sub_software,
+    "di-events": _sub_di_events,
+    "search-api": _sub_search_api,
+}
+
+
+def build_parser(only: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Build the CLI parser.
+
+    When `only` names a known subcommand, register just that one — short
+    invocations like `jc user-get --id X` skip ~60 add_argument calls of
+    parser construction. --help and unknown commands use the full build.
+    """
     parser = argparse.ArgumentParser(
         prog="jc-mcp",
         description="JumpCloud MCP viewer-level CLI (using MCP Streamable HTTP).",
     )
     sub = parser.add_subparsers(dest="command", required=True)
+    if only is not None:
+        _SUBCOMMANDS[only](sub)
+    else:
+        for build in _SUBCOMMANDS.values():
+            build(sub)
+    return parser
 
-    # tools
-    p_tools = sub.add_parser("tools", help="List MCP tools exposed by JumpCloud")
-    p_tools.set_defaults(func=cmd_tools)
-
-    # admins_list
-    p_admins = sub.add_parser("admins", help="List JumpCloud console admins")
-    p_admins.add_argument("--limit", type=int, default=10)
-    p_admins.add_argument("--skip", type=int, default=0)
-    p_admins.add_argument("--search", type=str, default="")
-    p_admins.set_defaults(func=cmd_admins)
-
-    # users_list
-    p_users = sub.add_parser("users", help="List JumpCloud users")
-    p_users.add_argument("--limit", type=int, default=10)
-    p_users.add_argument("--skip", type=int, default=0)
-    p_users.add_argument("--searchTerm", type=str, default="")
-    p_users.set_defaults(func=cmd_users)
-
-    # user_get
-    p_user_get = sub.add_parser("user-get", help="Get a specific user by ID")
-    p_user_get.add_argument("--id", required=True)
-    p_user_get.set_defaults(func=cmd_user_get)
-
-    # user_groups_list
-    p_user_groups = sub.add_parser("user-groups", help="List all user groups")
-    p_user_groups.add_argument("--limit", type=int, default=10)
-    p_user_groups.add_argument("--skip", type=int, default=0)
-    p_user_groups.add_argument("--search", type=str, default="")
-    p_user_groups.add_argument("--disabled", action="store_true")
-    p_user_groups.set_defaults(func=cmd_user_groups)
-
-    # user_group_membership
-    p_ugm = sub.add_parser("user-group-members", help="List members of a user group")
-    p_ugm.add_argument("--group-id", required=True)
-    p_ugm.add_argument("--limit", type=int, default=10)
-    p_ugm.add_argument("--skip", type=int, default=0)
-    p_ugm.set_defaults(func=cmd_user_group_members)
-
-    # applications_list / application_get
-    p_apps = sub.add_parser("apps", help="List SSO applications")
-    p_apps.add_argument("--limit", type=int, default=10)
-    p_apps.add_argument("--skip", type=int, default=0)
-    p_apps.add_argument("--search", type=str, default="")
-    p_apps.set_defaults(func=cmd_apps)
-
-    p_app_get = sub.add_parser("app-get", help="Get a specific application by ID")
-    p_app_get.add_argument("--id", required=True)
-    p_app_get.set_defaults(func=cmd_app_get)
-
-    # devices & device groups
-    p_devices = sub.add_parser("devices", help="List devices")
-    p_devices.add_argument("--limit", type=int, default=10)
-    p_devices.add_argument("--skip", type=int, default=0)
-    p_devices.add_argument("--search", type=str, default="")
-    p_devices.set_defaults(func=cmd_devices)
-
-    p_device_get = sub.add_parser("device-get", help="Get a device by ID")
-    p_device_get.add_argument("--id", required=True)
-    p_device_get.set_defaults(func=cmd_device_get)
-
-    p_dgroups = sub.add_parser("device-groups", help="List device groups")
-    p_dgroups.add_argument("--limit", type=int, default=10)
-    p_dgroups.add_argument("--skip", type=int, default=0)
-    p_dgroups.add_argument("--search", type=str, default="")
-    p_dgroups.add_argument("--disabled", action="store_true")
-    p_dgroups.set_defaults(func=cmd_device_groups)
-
-    p_dgm = sub.add_parser("device-group-members", help="List members of a device group")
-    p_dgm.add_argument("--group-id", required=True)
-    p_dgm.add_argument("--limit", type=int, default=10)
-    p_dgm.add_argument("--skip", type=int, default=0)
-    p_dgm.set_defaults(func=cmd_device_group_members)
-
-    # commands & results
-    p_cmds = sub.add_parser("commands", help="List commands (scripts)")
-    p_cmds.add_argument("--limit", type=int, default=10)
-    p_cmds.add_argument("--skip", type=int, default=0)
-    p_cmds.set_defaults(func=cmd_commands)
-
-    p_cmd_get = sub.add_parser("command-get", help="Get a specific command by ID")
-    p_cmd_get.add_argument("--id", required=True)
-    p_cmd_get.set_defaults(func=cmd_command_get)
-
-    p_cmd_dev = sub.add_parser("command-devices", help="List devices a command runs on")
-    p_cmd_dev.add_argument("--id", required=True, help="Command ID")
-    p_cmd_dev.add_argument("--limit", type=int, default=10)
-    p_cmd_dev.add_argument("--skip", type=int, default=0)
-    p_cmd_dev.set_defaults(func=cmd_command_devices)
-
-    p_cmd_dg = sub.add_parser("command-device-groups", help="List device groups for a command")
-    p_cmd_dg.add_argument("--id", required=True, help="Command ID")
-    p_cmd_dg.add_argument("--limit", type=int, default=10)
-    p_cmd_dg.add_argument("--skip", type=int, default=0)
-    p_cmd_dg.set_defaults(func=cmd_command_device_groups)
-
-    p_cmd_res = sub.add_parser("command-results", help="List results for a specific command")
-    p_cmd_res.add_argument("--id", required=True, help="Command ID")
-    p_cmd_res.add_argument("--limit", type=int, default=10)
-    p_cmd_res.add_argument("--skip", type=int, default=0)
-    p_cmd_res.set_defaults(func=cmd_command_results)
-
-    p_cmdresults = sub.add_parser("commandresults", help="List recent command results across all commands")
-    p_cmdresults.add_argument("--limit", type=int, default=10)
-    p_cmdresults.add_argument("--skip", type=int, default=0)
-    p_cmdresults.set_defaults(func=cmd_commandresults)
-
-    # policies & software
-    p_policies = sub.add_parser("policies", help="List security/configuration policies")
-    p_policies.add_argument("--limit", type=int, default=10)
-    p_policies.add_argument("--skip", type=int, default=0)
-    p_policies.add_argument("--search", type=str, default="")
-    p_policies.set_defaults(func=cmd_policies)
-
-    p_policy_get = sub.add_parser("policy-get", help="Get a specific policy by ID")
-    p_policy_get.add_argument("--id", required=True)
-    p_policy_get.set_defaults(func=cmd_policy_get)
-
-    p_software = sub.add_parser("software", help="List managed software applications")
-    p_software.add_argument("--limit", type=int, default=10)
-    p_software.add_argument("--skip", type=int, default=0)
-    p_software.set_defaults(func=cmd_software)
-
-    # DI events
-    p_di = sub.add_parser("di-events", help="Fetch Directory Insights events (audit logs)")
-    p_di.add_argument("--service", type=str, default="all",
-                      help="Service (asset_management, sso, systems, all, etc.)")
-    p_di.add_argument("--event-type", type=str, default="")
-    p_di.add_argument("--initiator-id", type=str, default="")
-    p_di.add_argument("--query", type=str, default="")
-    p_di.add_argument("--exact-match", type=str, default="")
-    p_di.add_argument("--start-time", type=str, default="7d",
-                      help="Duration (e.g., 7d) or ISO8601 start time")
-    p_di.add_argument("--limit", type=int, default=50)
-    p_di.set_defaults(func=cmd_di_events)
-
-    # search_api (natural language search/aggregation)
-    p_search = sub.add_parser("search-api", help="Use AI-powered search_api with natural language")
-    p_search.add_argument("query", type=str, help="Natural-language question")
-    p_search.set_defaults(func=cmd_search_api)
 
-    return parser
+async def _run_cli(args: argparse.Namespace) -> None:
+    await args.func(args)
+    if _BG_TASKS:
+        # Let stale-while-revalidate refreshes finish before the loop dies.
+        await asyncio.gather(*tuple(_BG_TASKS), return_exceptions=True)
 
 
 def main():
-    parser = build_parser()
+    # Peek at the subcommand first so only its parser gets built; anything
+    # unrecognized (or --help) falls back to the full parser.
+    only = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] in _SUBCOMMANDS else None
+    parser = build_parser(only=only)
     args = parser.parse_args()
+
+    # Prefer uvloop's libuv-based event loop when available — a drop-in
+    # swap that noticeably speeds up HTTP-client-heavy asyncio like ours.
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     try:
-        asyncio.run(args.func(args))
+        if args.func is cmd_daemon:
+            # The daemon serves many requests over its lifetime; run it on
+            # one explicit loop instead of asyncio.run's per-call loop so
+            # the session held by SessionHolder lives on a stable loop.
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(cmd_daemon(args))
+            finally:
+                loop.close()
+        else:
+            asyncio.run(_run_cli(args))
     except KeyboardInterrupt:
         print("\nInterrupted by user", file=sys.stderr)
         sys.exit(1)